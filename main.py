@@ -1,32 +1,173 @@
 import cv2
 import numpy as np
-import speech_recognition as sr
+from turbojpeg import TurboJPEG, TJSAMP_420
+import sounddevice as sd
+import webrtcvad
+import vosk
 from googletrans import Translator, LANGUAGES
 from gtts import gTTS
 import pygame
 import io
+import os
+import functools
+import collections
+import json
+import msgspec
 import threading
+import multiprocessing
 import queue
+from concurrent.futures import ThreadPoolExecutor, CancelledError
 import socket
-import pickle
+import errno
 import struct
-import select
+import selectors
 import time
 
+class TextMessage(msgspec.Struct):
+    """Text/control message sent to the remote peer"""
+    seq: int
+    lang: str
+    timestamp: float
+    text: str
+
+msg_encoder = msgspec.msgpack.Encoder()
+msg_decoder = msgspec.msgpack.Decoder(TextMessage)
+
+def speech_recognition_worker(audio_queue, transcript_queue, model_path, sample_rate, running):
+    """Stream audio through an on-device Vosk recognizer (runs in its own process)"""
+    vosk.SetLogLevel(-1)
+    recognizer = vosk.KaldiRecognizer(vosk.Model(model_path), sample_rate)
+    last_partial = ''
+    while running.is_set():
+        try:
+            chunk = audio_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        try:
+            # None marks the end of an utterance detected by the VAD
+            if chunk is None:
+                text, final = json.loads(recognizer.FinalResult())['text'], True
+            elif recognizer.AcceptWaveform(chunk):
+                text, final = json.loads(recognizer.Result())['text'], True
+            else:
+                text, final = json.loads(recognizer.PartialResult())['partial'], False
+            
+            if final:
+                last_partial = ''
+                if text:
+                    transcript_queue.put((text, True))
+            elif text and text != last_partial:
+                last_partial = text
+                transcript_queue.put((text, False))
+        except Exception as e:
+            print(f"Recognition error: {e}")
+
+def load_local_translator(model_path):
+    """Load an int8 CTranslate2 model and its SentencePiece tokenizers, returning a batch translate function"""
+    # Only needed when a local model is installed
+    import ctranslate2
+    import sentencepiece as spm
+    
+    model = ctranslate2.Translator(model_path, device='cpu', compute_type='int8')
+    source_sp = spm.SentencePieceProcessor(model_file=os.path.join(model_path, 'source.spm'))
+    target_sp = spm.SentencePieceProcessor(model_file=os.path.join(model_path, 'target.spm'))
+    
+    def translate(texts):
+        batch = [source_sp.encode(text, out_type=str) + ['</s>'] for text in texts]
+        results = model.translate_batch(batch)
+        return [target_sp.decode(result.hypotheses[0]) for result in results]
+    
+    # Warm up so the first real utterance doesn't pay for lazy initialization
+    translate(["hello"])
+    return translate
+
+def translation_worker(text_queue, translation_queue, source_lang, target_lang, model_path, running,
+                       max_batch=8, batch_window=0.05):
+    """Translate text to target language (runs in its own process)
+
+    Texts are batched for a local model; Google Translate takes one text per request,
+    so that path translates each text as soon as it arrives.
+    """
+    # Prefer a local int8 model for this language pair, fall back to Google Translate
+    translate = None
+    if os.path.isdir(model_path):
+        try:
+            translate = load_local_translator(model_path)
+        except (ImportError, OSError, RuntimeError) as e:
+            print(f"Could not load local translation model, using Google Translate: {e}")
+    if translate is None:
+        # googletrans keeps one HTTP client for the translator's lifetime
+        translator = Translator()
+        translate = lambda texts: [translator.translate(texts[0], src=source_lang, dest=target_lang).text]
+        max_batch = 1
+    
+    while running.is_set():
+        try:
+            texts = [text_queue.get(timeout=0.1)]
+        except queue.Empty:
+            continue
+        
+        # Collect whatever else arrives within the batch window
+        deadline = time.monotonic() + batch_window
+        while len(texts) < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                texts.append(text_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        try:
+            for translation in translate(texts):
+                translation_queue.put(translation)
+        except Exception as e:
+            print(f"Translation error: {e}")
+
+@functools.lru_cache(maxsize=32)
+def synthesize_speech(lang, text):
+    """Synthesize text with gTTS into a decoded pygame Sound, cached for repeated phrases"""
+    fp = io.BytesIO()
+    gTTS(text, lang=lang).write_to_fp(fp)
+    fp.seek(0)
+    return pygame.mixer.Sound(fp)
+
 class VideoCallTranslator:
+    # Message header: type (1 byte) and payload size (8 bytes)
+    _HDR = struct.Struct("!BQ")
+    # Video datagram header: sequence number and capture timestamp (microseconds)
+    _VIDEO_HDR = struct.Struct("!IQ")
+    _MAX_DATAGRAM = 65507
+    # Text messages are tiny; anything larger means a broken or hostile peer
+    _MAX_MESSAGE = 64 * 1024
+    # Scatter/gather sends aren't available on Windows
+    _HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+    
     def __init__(self):
         # Initialize components
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.translator = Translator()
         pygame.mixer.init()
+        # Translations play in order on one reserved channel
+        pygame.mixer.set_reserved(1)
+        self.voice_channel = pygame.mixer.Channel(0)
+        
+        # Queues shared with the recognition/translation processes. Workers are spawned
+        # rather than forked: by the time they start this process already runs SDL's
+        # audio thread, the camera and possibly a CUDA context, none of which survive fork
+        self.mp_context = multiprocessing.get_context('spawn')
+        self.audio_queue = self.mp_context.Queue()
+        self.transcript_queue = self.mp_context.Queue()
+        self.text_queue = self.mp_context.Queue()
+        self.translation_queue = self.mp_context.Queue()
+        self.workers_running = self.mp_context.Event()
         
         # Queues for inter-thread communication
-        self.audio_queue = queue.Queue()
-        self.text_queue = queue.Queue()
-        self.translation_queue = queue.Queue()
         self.video_queue = queue.Queue()
         self.network_queue = queue.Queue()
+        # Only the newest frames are worth sending, so video is bounded and drops the oldest
+        self.video_send_queue = queue.Queue(maxsize=2)
+        # Bounded so a slow disk can't pile up encoded frames in memory
+        self.record_queue = queue.Queue(maxsize=30)
+        self.record_dropped = 0
         
         # Configuration with Hindi added
         self.languages = {
@@ -45,6 +186,10 @@ class VideoCallTranslator:
         self.target_lang = 'hi'  # Default to Hindi as target
         self.running = False
         self.translating = True
+        self.latest_text = None
+        self.latest_translation = None
+        self.caption_lock = threading.Lock()
+        self.caption_dirty = False
         self.in_call = False
         self.is_host = False
         
@@ -53,18 +198,84 @@ class VideoCallTranslator:
         if not self.cap.isOpened():
             raise RuntimeError("Could not open video device")
         self.frame_size = (640, 480)
+        self.max_jpeg_quality = 80
+        self.min_jpeg_quality = 30
+        self.jpeg_quality = self.max_jpeg_quality
+        # Quality steps back up after this many consecutive frames fit in a datagram
+        self.quality_recovery_frames = 30
+        self.frames_fit = 0
+        # libjpeg-turbo SIMD codec, loaded in start() only when frames are encoded;
+        # keep OpenCV's own threading from oversubscribing the cores
+        self.jpeg = None
+        cv2.setNumThreads(2)
         self.font = cv2.FONT_HERSHEY_SIMPLEX
+        # Captions are rendered into a strip overlay only when the text changes
+        self.caption_height = 90
+        self.caption_overlay = np.zeros((self.caption_height, self.frame_size[0], 3), dtype=np.uint8)
+        self.caption_mask = np.zeros((self.caption_height, self.frame_size[0]), dtype=np.uint8)
+        self.caption_where = np.zeros((self.caption_height, self.frame_size[0], 1), dtype=bool)
+        self.has_caption = False
+        # JPEG encoding releases the GIL, so it runs on a small pool off the capture loop
+        self.encoder_pool = ThreadPoolExecutor(max_workers=2)
+        # Each frame is encoded once and the JPEG bytes are shared by the network and recording
+        self.record_path = None
+        self.record_file = None
+        
+        # Preallocated capture and resize buffers, reused every frame
+        cam_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.frame_size[0]
+        cam_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.frame_size[1]
+        self.frame_buf = np.empty((cam_h, cam_w, 3), dtype=np.uint8)
+        self.resized_buf = np.empty((self.frame_size[1], self.frame_size[0], 3), dtype=np.uint8)
+        
+        # Ring of frame slots handed to the encoder pool by index; a slot goes back
+        # on the free list once its encode finishes, which also bounds the producer
+        self.frame_slots = 4
+        self.frames = np.empty((self.frame_slots, self.frame_size[1], self.frame_size[0], 3), dtype=np.uint8)
+        self.free_slots = queue.Queue()
+        for slot in range(self.frame_slots):
+            self.free_slots.put(slot)
+        
+        # Resize on the GPU when OpenCV was built with CUDA; the buffer pool must be
+        # configured before any stream is created so per-frame buffers come from its stack
+        self.use_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        if self.use_cuda:
+            stack_size = (cam_w * cam_h + self.frame_size[0] * self.frame_size[1]) * 3 * 2
+            cv2.cuda.setBufferPoolUsage(True)
+            cv2.cuda.setBufferPoolConfig(cv2.cuda.getDevice(), stack_size, 2)
+            self.cuda_stream = cv2.cuda.Stream()
+            self.cuda_pool = cv2.cuda.BufferPool(self.cuda_stream)
         
         # Networking
         self.socket = None
         self.connection = None
+        self.video_socket = None
+        self.video_peer = None
+        self.peer_ip = None
+        self.video_seq = 0
+        self.last_video_seq = None
         self.host = '0.0.0.0'
         self.port = 5000
         self.remote_frame = None
+        self.text_seq = 0
+        self.header_buf = bytearray(self._HDR.size)
+        # Preallocated receive buffers, filled in place with recv_into
+        self.rx_buf = bytearray(self._HDR.size + self._MAX_MESSAGE)
+        self.rx_len = 0
+        self.video_rx_buf = bytearray(self._MAX_DATAGRAM)
+        self.wakeup_recv, self.wakeup_send = socket.socketpair()
+        self.wakeup_recv.setblocking(False)
+        self.wakeup_send.setblocking(False)
+        self.video_header_buf = bytearray(self._VIDEO_HDR.size)
         
-        # Audio setup
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        # Audio setup (webrtcvad accepts 10/20/30 ms frames of 16-bit mono PCM)
+        self.sample_rate = 16000
+        self.vad_frame_samples = self.sample_rate * 20 // 1000
+        self.vad_silence_frames = 15  # 300 ms of silence ends an utterance
+        self.vad_preroll_frames = 10  # 200 ms window kept from before speech starts
+        self.vad_trigger_ratio = 0.6  # Share of voiced frames in the window that starts an utterance
+        self.audio_cpu = 0  # Core the audio capture thread is pinned to
+        self.vosk_model_dir = os.path.join('models', 'vosk')
+        self.ct2_model_dir = os.path.join('models', 'ct2')
 
     def show_language_menu(self):
         """Display language selection menu with Hindi option"""
@@ -112,86 +323,167 @@ class VideoCallTranslator:
                 break
             else:
                 print("Invalid choice")
+        
+        while True:
+            self.record_path = input("Record outgoing video to file (leave blank to skip): ") or None
+            if not self.record_path:
+                break
+            try:
+                self.record_file = open(self.record_path, 'wb')
+                break
+            except OSError as e:
+                print(f"Cannot open {self.record_path} for writing: {e}")
 
     def audio_capture_thread(self):
-        """Capture audio from microphone"""
-        with self.microphone as source:
+        """Capture microphone audio and forward voiced 20 ms frames"""
+        self.raise_audio_priority()
+        vad = webrtcvad.Vad(3)
+        preroll = collections.deque(maxlen=self.vad_preroll_frames)
+        in_speech = False
+        silent_frames = 0
+        with sd.RawInputStream(samplerate=self.sample_rate, blocksize=self.vad_frame_samples,
+                               dtype='int16', channels=1) as stream:
             while self.running:
                 try:
-                    audio = self.recognizer.listen(source, timeout=2, phrase_time_limit=5)
-                    self.audio_queue.put(audio)
-                except sr.WaitTimeoutError:
-                    continue
+                    data, _ = stream.read(self.vad_frame_samples)
+                    frame = bytes(data)
+                    voiced = vad.is_speech(frame, self.sample_rate)
+                    if not in_speech:
+                        # Start only when most of the recent window is voiced, then send the
+                        # whole window so quiet word onsets reach the recognizer
+                        preroll.append((frame, voiced))
+                        num_voiced = sum(v for _, v in preroll)
+                        if len(preroll) == preroll.maxlen and num_voiced >= self.vad_trigger_ratio * preroll.maxlen:
+                            in_speech = True
+                            silent_frames = 0
+                            for buffered, _ in preroll:
+                                self.audio_queue.put(buffered)
+                            preroll.clear()
+                        continue
+                    
+                    # Keep trailing silence so the recognizer can settle, then end the utterance
+                    self.audio_queue.put(frame)
+                    if voiced:
+                        silent_frames = 0
+                    else:
+                        silent_frames += 1
+                        if silent_frames >= self.vad_silence_frames:
+                            in_speech = False
+                            self.audio_queue.put(None)
                 except Exception as e:
                     print(f"Audio capture error: {e}")
                     time.sleep(0.1)
 
-    def speech_recognition_thread(self):
-        """Convert audio to text"""
+    def raise_audio_priority(self):
+        """Pin the calling thread to one core and give it real-time priority where permitted"""
+        if not hasattr(os, 'sched_setaffinity'):
+            return  # Affinity and scheduling policy are per-thread only on Linux
+        
+        try:
+            os.sched_setaffinity(0, {self.audio_cpu})
+        except OSError as e:
+            print(f"Could not pin audio thread: {e}")
+        
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+        except PermissionError:
+            # SCHED_FIFO needs root or CAP_SYS_NICE; try a higher nice priority instead
+            try:
+                os.nice(-10)
+            except PermissionError:
+                print("Could not raise audio thread priority")
+
+    def transcript_thread(self):
+        """Dispatch recognized text to the display, network and translator"""
         while self.running:
-            if not self.audio_queue.empty():
-                audio = self.audio_queue.get()
-                try:
-                    text = self.recognizer.recognize_google(audio, language=self.source_lang)
-                    self.text_queue.put(text)
-                    if self.in_call:
-                        self.network_queue.put(('text', text))
-                except sr.UnknownValueError:
-                    continue
-                except sr.RequestError as e:
-                    print(f"Speech recognition error: {e}")
-                except Exception as e:
-                    print(f"Recognition error: {e}")
+            try:
+                text, final = self.transcript_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            with self.caption_lock:
+                self.latest_text = text
+                self.caption_dirty = True
+            # Partial hypotheses only update the caption
+            if not final:
+                continue
+            if self.in_call:
+                self.queue_outgoing(('text', text))
+            if self.translating:
+                self.text_queue.put(text)
 
-    def translation_thread(self):
-        """Translate text to target language (including Hindi)"""
+    def speech_output_thread(self):
+        """Display and speak translations (including Hindi)"""
         while self.running:
-            if not self.text_queue.empty():
-                text = self.text_queue.get()
-                if self.translating:
-                    try:
-                        translation = self.translator.translate(text, src=self.source_lang, dest=self.target_lang).text
-                        self.translation_queue.put(translation)
-                        
-                        # Convert translation to speech
-                        tts = gTTS(translation, lang=self.target_lang)
-                        fp = io.BytesIO()
-                        tts.write_to_fp(fp)
-                        fp.seek(0)
-                        
-                        # Play audio
-                        pygame.mixer.music.load(fp)
-                        pygame.mixer.music.play()
-                    except Exception as e:
-                        print(f"Translation error: {e}")
+            try:
+                translation = self.translation_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            with self.caption_lock:
+                self.latest_translation = translation
+                self.caption_dirty = True
+            try:
+                # Convert translation to speech and play it
+                sound = synthesize_speech(self.target_lang, translation)
+                # A channel holds one queued sound, so wait for that slot to free up
+                while self.voice_channel.get_queue() is not None and self.running:
+                    time.sleep(0.05)
+                self.voice_channel.queue(sound)  # Starts right away when the channel is idle
+            except Exception as e:
+                print(f"Speech output error: {e}")
 
     def video_capture_thread(self):
         """Capture and process video frames"""
         while self.running:
-            ret, frame = self.cap.read()
+            # Decode straight into the preallocated buffer (retrieve reallocates it if the size differs)
+            ret = self.cap.grab()
+            if ret:
+                ret, frame = self.cap.retrieve(self.frame_buf)
             if not ret:
                 print("Failed to capture frame")
                 time.sleep(0.1)
                 continue
+            self.frame_buf = frame
             
-            frame = cv2.resize(frame, self.frame_size)
+            # Frames to send or record go into a free ring slot; otherwise (nothing to
+            # encode, or every slot still being encoded) into the display-only buffer
+            slot = None
+            if self.in_call or self.record_path:
+                try:
+                    slot = self.free_slots.get_nowait()
+                except queue.Empty:
+                    pass
+            frame = self.resized_buf if slot is None else self.frames[slot]
+            
+            if self.use_cuda:
+                self.resize_on_gpu(self.frame_buf, frame)
+            else:
+                cv2.resize(self.frame_buf, self.frame_size, dst=frame)
             
-            # Display original text if available
-            if not self.text_queue.empty():
-                text = self.text_queue.queue[-1]
-                cv2.putText(frame, f"Original: {text}", (10, 30), self.font, 0.7, (0, 255, 0), 2)
+            # Re-render captions only when new text has arrived
+            with self.caption_lock:
+                dirty, self.caption_dirty = self.caption_dirty, False
+                text, translation = self.latest_text, self.latest_translation
+            if dirty:
+                self.render_captions(text, translation)
             
-            # Display translation if available
-            if not self.translation_queue.empty() and self.translating:
-                translation = self.translation_queue.queue[-1]
-                cv2.putText(frame, f"Translated: {translation}", (10, 70), self.font, 0.7, (0, 0, 255), 2)
+            # Copy the caption pixels onto the top strip of the frame
+            if self.has_caption:
+                np.copyto(frame[:self.caption_height], self.caption_overlay, where=self.caption_where)
             
             # Show local video
             cv2.imshow('Video Translator', frame)
             
-            # Send frame if in call
-            if self.in_call:
-                self.network_queue.put(('video', frame))
+            # Encode once (releasing the slot when done) and share the result
+            if slot is not None:
+                encode = self.encoder_pool.submit(self.encode_frame, frame)
+                encode.add_done_callback(lambda _, slot=slot: self.free_slots.put(slot))
+                if self.in_call:
+                    self.queue_video(encode)
+                if self.record_path:
+                    try:
+                        self.record_queue.put_nowait(encode)
+                    except queue.Full:
+                        self.record_dropped += 1
             
             # Show remote video if available
             if self.remote_frame is not None:
@@ -200,14 +492,270 @@ class VideoCallTranslator:
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 self.running = False
 
+    def render_captions(self, text, translation):
+        """Draw the original and translated text into the caption overlay and its mask"""
+        self.caption_overlay.fill(0)
+        self.caption_mask.fill(0)
+        lines = []
+        # Display original text if available
+        if text is not None:
+            lines.append((f"Original: {text}", (10, 30), (0, 255, 0)))
+        # Display translation if available
+        if translation is not None and self.translating:
+            lines.append((f"Translated: {translation}", (10, 70), (0, 0, 255)))
+        for line, org, color in lines:
+            cv2.putText(self.caption_overlay, line, org, self.font, 0.7, color, 2)
+            cv2.putText(self.caption_mask, line, org, self.font, 0.7, 255, 2)
+        np.greater(self.caption_mask[..., None], 0, out=self.caption_where)
+        self.has_caption = bool(lines)
+
+    def recording_thread(self):
+        """Append encoded frames to the recording file as a Motion JPEG stream"""
+        if not self.record_file:
+            return
+        
+        try:
+            with self.record_file as f:
+                # Keep going after shutdown until every queued frame is written
+                while self.running or not self.record_queue.empty():
+                    try:
+                        encode = self.record_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    try:
+                        data = encode.result()
+                    except CancelledError:
+                        continue
+                    if data is not None:
+                        f.write(data)
+        except OSError as e:
+            # Stop queueing frames for a recorder that can no longer write
+            print(f"Recording stopped: {e}")
+            self.record_path = None
+        
+        if self.record_dropped:
+            print(f"Recording skipped {self.record_dropped} frames because the disk couldn't keep up")
+
+    def resize_on_gpu(self, frame, dst):
+        """Resize a frame into dst on the GPU using buffers from the stream's pool"""
+        h, w = frame.shape[:2]
+        gpu_frame = self.cuda_pool.getBuffer(h, w, cv2.CV_8UC3)
+        gpu_resized = self.cuda_pool.getBuffer(self.frame_size[1], self.frame_size[0], cv2.CV_8UC3)
+        gpu_frame.upload(frame, self.cuda_stream)
+        cv2.cuda.resize(gpu_frame, self.frame_size, dst=gpu_resized, stream=self.cuda_stream)
+        gpu_resized.download(self.cuda_stream, dst)
+        self.cuda_stream.waitForCompletion()
+        # Pool buffers are a stack and must be released in reverse order of allocation
+        del gpu_resized
+        del gpu_frame
+
+    def encode_frame(self, frame):
+        """Compress a frame to JPEG bytes, or None on failure"""
+        try:
+            return self.jpeg.encode(frame, quality=self.jpeg_quality, jpeg_subsample=TJSAMP_420)
+        except OSError as e:
+            print(f"Frame encode error: {e}")
+            return None
+
+    def send_message(self, msg_type, data):
+        """Send a header and payload with one sendmsg call (without concatenating them) where supported"""
+        self._HDR.pack_into(self.header_buf, 0, msg_type, len(data))
+        if not self._HAS_SENDMSG:
+            self.connection.sendall(self.header_buf + data)
+            return
+        
+        buffers = [memoryview(self.header_buf), memoryview(data)]
+        while buffers:
+            sent = self.connection.sendmsg(buffers)
+            # Drop fully sent buffers and trim a partially sent one
+            while buffers and sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                buffers.pop(0)
+            if buffers:
+                buffers[0] = buffers[0][sent:]
+
+    def send_video(self, data):
+        """Send a JPEG frame as a single sequenced UDP datagram"""
+        if self.video_peer is None:
+            return  # Host hasn't heard from the client yet
+        if self._VIDEO_HDR.size + len(data) > self._MAX_DATAGRAM:
+            self.lower_video_quality(len(data))
+            return
+        self.video_seq = (self.video_seq + 1) & 0xFFFFFFFF
+        self._VIDEO_HDR.pack_into(self.video_header_buf, 0, self.video_seq, time.time_ns() // 1000)
+        try:
+            if self._HAS_SENDMSG:
+                self.video_socket.sendmsg([memoryview(self.video_header_buf), memoryview(data)], [], 0, self.video_peer)
+            else:
+                self.video_socket.sendto(self.video_header_buf + data, self.video_peer)
+        except BlockingIOError:
+            return  # Send buffer full, drop the frame
+        except OSError as e:
+            if e.errno != errno.EMSGSIZE:
+                raise
+            self.lower_video_quality(len(data))
+            return
+        
+        # Recover quality gradually once frames fit again
+        self.frames_fit += 1
+        if self.frames_fit >= self.quality_recovery_frames and self.jpeg_quality < self.max_jpeg_quality:
+            self.jpeg_quality = min(self.max_jpeg_quality, self.jpeg_quality + 5)
+            self.frames_fit = 0
+
+    def lower_video_quality(self, size):
+        """Drop a frame that didn't fit in one datagram and reduce JPEG quality for the next ones"""
+        self.frames_fit = 0
+        if self.jpeg_quality > self.min_jpeg_quality:
+            self.jpeg_quality = max(self.min_jpeg_quality, self.jpeg_quality - 10)
+            print(f"Video frame of {size} bytes too large for one datagram, JPEG quality now {self.jpeg_quality}")
+
+    def receive_video(self):
+        """Drain pending video datagrams, keeping only in-order frames"""
+        while True:
+            try:
+                size, addr = self.video_socket.recvfrom_into(self.video_rx_buf)
+            except BlockingIOError:
+                return True
+            except OSError as e:
+                print(f"Video receive error: {e}")
+                return True
+            if addr[0] != self.peer_ip:
+                continue  # Not from our call peer
+            if self.video_peer is None:
+                self.video_peer = addr
+            if size <= self._VIDEO_HDR.size:
+                continue  # Registration datagram
+            
+            seq, _ = self._VIDEO_HDR.unpack_from(self.video_rx_buf)
+            # Drop late or duplicate frames (sequence numbers wrap at 32 bits)
+            if self.last_video_seq is not None and not 0 < (seq - self.last_video_seq) & 0xFFFFFFFF < 0x80000000:
+                continue
+            self.last_video_seq = seq
+            
+            try:
+                self.remote_frame = self.jpeg.decode(memoryview(self.video_rx_buf)[self._VIDEO_HDR.size:size])
+            except Exception as e:
+                print(f"Frame decode error: {e}")
+
+    def queue_outgoing(self, item):
+        """Queue an item for the peer and wake the network thread"""
+        self.network_queue.put(item)
+        self.wake_network()
+
+    def queue_video(self, encode):
+        """Queue a pending frame encode for the peer, dropping the oldest one if the queue is full"""
+        try:
+            self.video_send_queue.put_nowait(encode)
+        except queue.Full:
+            try:
+                # Not cancelled: the same encode may also be waiting to be recorded
+                self.video_send_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.video_send_queue.put_nowait(encode)
+        self.wake_network()
+
+    def wake_network(self):
+        """Wake the network thread's select()"""
+        try:
+            self.wakeup_send.send(b'\0')
+        except BlockingIOError:
+            pass  # A wakeup is already pending
+
+    def send_pending(self):
+        """Send everything queued for the peer"""
+        # Clear wakeups first so items queued after draining wake us again
+        try:
+            self.wakeup_recv.recv(4096)
+        except BlockingIOError:
+            pass
+        
+        while True:
+            try:
+                data_type, data = self.network_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            try:
+                if data_type == 'text':
+                    # Send text as a msgpack-encoded message with header
+                    self.text_seq += 1
+                    data = msg_encoder.encode(TextMessage(self.text_seq, self.source_lang, time.time(), data))
+                    self.send_message(1, data)  # 1 for text
+            except (ConnectionResetError, BrokenPipeError) as e:
+                print(f"Send error: {e}")
+                return False
+            except Exception as e:
+                print(f"Send error: {e}")
+        
+        while True:
+            try:
+                encode = self.video_send_queue.get_nowait()
+            except queue.Empty:
+                return True
+            
+            try:
+                # Wait for the frame's JPEG encode to finish
+                data = encode.result()
+                if data is not None:
+                    self.send_video(data)
+            except CancelledError:
+                continue
+            except Exception as e:
+                print(f"Send error: {e}")
+
+    def receive_text(self):
+        """Read available bytes into the receive buffer and handle every complete message"""
+        try:
+            received = self.connection.recv_into(memoryview(self.rx_buf)[self.rx_len:])
+        except ConnectionResetError:
+            received = 0
+        if not received:
+            print("Remote peer disconnected")
+            return False
+        self.rx_len += received
+        
+        # Messages may arrive split across reads, so only consume complete ones
+        start = 0
+        with memoryview(self.rx_buf) as view:
+            while self.rx_len - start >= self._HDR.size:
+                msg_type, msg_size = self._HDR.unpack_from(view, start)
+                if msg_size > self._MAX_MESSAGE:
+                    print(f"Message of {msg_size} bytes exceeds limit, dropping connection")
+                    return False
+                end = start + self._HDR.size + msg_size
+                if end > self.rx_len:
+                    break
+                
+                if msg_type == 1:  # Text data
+                    try:
+                        msg = msg_decoder.decode(view[start + self._HDR.size:end])
+                        print(f"Received text ({msg.lang}): {msg.text}")
+                    except msgspec.DecodeError as e:
+                        print(f"Text decode error: {e}")
+                start = end
+        
+        # Move a trailing partial message to the front of the buffer
+        if start:
+            self.rx_buf[:self.rx_len - start] = self.rx_buf[start:self.rx_len]
+            self.rx_len -= start
+        return True
+
     def network_thread(self):
         """Handle network communication with proper framing"""
         if not self.in_call:
             return
             
         try:
+            # Video travels over UDP on the next port so a lost packet only drops one frame;
+            # the host binds it before accepting so the client's first datagram isn't lost
+            self.video_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.video_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)  # Also lifts macOS' 9216-byte datagram default
+            self.video_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            
             if self.is_host:
                 # Host mode
+                self.video_socket.bind((self.host, self.port + 1))
                 self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 self.socket.bind((self.host, self.port))
@@ -223,76 +771,27 @@ class VideoCallTranslator:
                 self.connection = self.socket
                 print("Connected to host")
             
-            self.connection.settimeout(0.1)
+            # Only accept video from the machine on the other end of the TCP connection
+            self.peer_ip = self.connection.getpeername()[0]
+            if not self.is_host:
+                self.video_peer = (self.peer_ip, self.port + 1)
+                self.video_socket.sendto(b'', self.video_peer)  # Let the host learn our address
+            self.video_socket.setblocking(False)
             
-            while self.running and self.connection:
-                # Send data
-                try:
-                    if not self.network_queue.empty():
-                        data_type, data = self.network_queue.get()
-                        
-                        if data_type == 'video':
-                            # Serialize frame
-                            data = pickle.dumps(data)
-                            # Send message type (1 byte) and size (8 bytes)
-                            header = struct.pack("!BQ", 0, len(data))  # 0 for video
-                            self.connection.sendall(header + data)
-                        elif data_type == 'text':
-                            # Send text with header
-                            data = data.encode('utf-8')
-                            header = struct.pack("!BQ", 1, len(data))  # 1 for text
-                            self.connection.sendall(header + data)
-                except (ConnectionResetError, BrokenPipeError, socket.timeout):
-                    continue
-                except Exception as e:
-                    print(f"Send error: {e}")
-                    break
-                
-                # Receive data
-                try:
-                    # Receive header (1 byte type + 8 byte size)
-                    header = self.connection.recv(9)
-                    if not header:
-                        continue
-                    
-                    # Unpack header
-                    msg_type, msg_size = struct.unpack("!BQ", header)
-                    
-                    # Receive actual data
-                    received = 0
-                    chunks = []
-                    while received < msg_size:
-                        chunk = self.connection.recv(min(msg_size - received, 4096))
-                        if not chunk:
-                            break
-                        chunks.append(chunk)
-                        received += len(chunk)
-                    
-                    if received < msg_size:
-                        continue  # Incomplete message, discard
-                    
-                    data = b''.join(chunks)
-                    
-                    if msg_type == 0:  # Video frame
-                        try:
-                            frame = pickle.loads(data)
-                            self.remote_frame = frame
-                        except Exception as e:
-                            print(f"Frame unpickling error: {e}")
-                    elif msg_type == 1:  # Text data
-                        try:
-                            text = data.decode('utf-8')
-                            print(f"Received text: {text}")
-                        except Exception as e:
-                            print(f"Text decode error: {e}")
-                            
-                except socket.timeout:
-                    continue
-                except struct.error:
-                    continue
-                except Exception as e:
-                    print(f"Receive error: {e}")
-                    break
+            # Sleep in select() until the peer sends something or a producer queues data
+            sel = selectors.DefaultSelector()
+            sel.register(self.connection, selectors.EVENT_READ, self.receive_text)
+            sel.register(self.video_socket, selectors.EVENT_READ, self.receive_video)
+            sel.register(self.wakeup_recv, selectors.EVENT_READ, self.send_pending)
+            
+            connected = True
+            while self.running and connected:
+                for key, _ in sel.select():
+                    # Handlers return False once the connection is gone
+                    if not key.data():
+                        connected = False
+                        break
+            sel.close()
                     
         except Exception as e:
             print(f"Network setup error: {e}")
@@ -301,6 +800,8 @@ class VideoCallTranslator:
                 self.connection.close()
             if self.socket:
                 self.socket.close()
+            if self.video_socket:
+                self.video_socket.close()
             print("Network connection closed")
 
     def start(self):
@@ -308,18 +809,38 @@ class VideoCallTranslator:
         self.show_language_menu()
         self.setup_call()
         
+        model_path = os.path.join(self.vosk_model_dir, self.source_lang)
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model not found at {model_path}")
+        mt_model_path = os.path.join(self.ct2_model_dir, f"{self.source_lang}-{self.target_lang}")
+        if self.in_call or self.record_path:
+            self.jpeg = TurboJPEG()
+        
         self.running = True
+        self.workers_running.set()
+        
+        # Recognition and translation run in separate processes so they don't contend for the GIL
+        processes = [
+            self.mp_context.Process(target=speech_recognition_worker,
+                                    args=(self.audio_queue, self.transcript_queue, model_path, self.sample_rate, self.workers_running)),
+            self.mp_context.Process(target=translation_worker,
+                                    args=(self.text_queue, self.translation_queue, self.source_lang, self.target_lang, mt_model_path, self.workers_running))
+        ]
         
         # Create threads
         threads = [
             threading.Thread(target=self.audio_capture_thread),
-            threading.Thread(target=self.speech_recognition_thread),
-            threading.Thread(target=self.translation_thread),
+            threading.Thread(target=self.transcript_thread),
+            threading.Thread(target=self.speech_output_thread),
             threading.Thread(target=self.video_capture_thread),
-            threading.Thread(target=self.network_thread) 
+            threading.Thread(target=self.network_thread),
+            threading.Thread(target=self.recording_thread)
         ]
         
-        # Start threads
+        # Start processes and threads
+        for p in processes:
+            p.daemon = True
+            p.start()
         for t in threads:
             t.daemon = True
             t.start()
@@ -329,6 +850,12 @@ class VideoCallTranslator:
         
         # Cleanup
         self.running = False
+        self.wake_network()
+        self.workers_running.clear()
+        for p in processes:
+            p.join(timeout=1)
+        threads[5].join(timeout=5)  # Let the recorder drain its queue and close the file
+        self.encoder_pool.shutdown(wait=False, cancel_futures=True)
         self.cap.release()
         cv2.destroyAllWindows()
         pygame.quit()